@@ -0,0 +1,167 @@
+# cython: language_level=3
+# Compiled versions of LRUPolicy and LFUPolicy from code.py.
+# Build in place with: python setup.py build_ext --inplace
+from heapq import nsmallest
+from operator import itemgetter
+from threading import Lock
+
+cdef object _MISS = object()
+# Sort key for (key, count) pairs
+cdef object _get_count = itemgetter(1)
+
+# LRU Policy (lazy eviction: grows to twice its size, then evicts the oldest half in one pass)
+cdef class LRUPolicy:
+    cdef public Py_ssize_t size
+    cdef public dict cache
+    cdef public object lock
+    # Tick of each key's last access; lower ticks are less recently used
+    cdef public dict ticks
+    cdef public unsigned long long tick
+
+    def __init__(self, Py_ssize_t size):
+        self.size = size
+        self.cache = {}
+        self.lock = Lock()
+        self.ticks = {}
+        self.tick = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.cache.get(key, _MISS)
+            if value is _MISS:
+                return None
+            self.ticks[key] = self.tick
+            self.tick += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self._put_locked(key, value)
+
+    def put_if_absent(self, key, value):
+        with self.lock:
+            if key not in self.cache:
+                self._put_locked(key, value)
+
+    cdef _put_locked(self, key, value):
+        cdef dict cache = self.cache, ticks = self.ticks
+        if key not in cache and len(cache) >= 2 * self.size:
+            # Evict the least recently used entries in a single sweep
+            for old_key, _ in nsmallest(self.size, ticks.items(), key=_get_count):
+                del cache[old_key]
+                del ticks[old_key]
+        cache[key] = value
+        ticks[key] = self.tick
+        self.tick += 1
+
+    def pop(self, key):
+        with self.lock:
+            self.ticks.pop(key, None)
+            return self.cache.pop(key, None)
+
+    def remove(self, key):
+        self.pop(key)
+
+    def items(self):
+        return list(self.cache.items())
+
+    def __str__(self):
+        return str(dict(self.items()))
+
+# LFU Policy
+cdef class LFUPolicy:
+    cdef public Py_ssize_t size
+    cdef public dict cache
+    cdef public object lock
+    cdef public dict frequency
+    # Keys grouped by frequency; each bucket is an insertion-ordered dict used as a set,
+    # so ties are evicted oldest first
+    cdef public dict buckets
+    cdef public Py_ssize_t min_freq
+
+    def __init__(self, Py_ssize_t size):
+        self.size = size
+        self.cache = {}
+        self.lock = Lock()
+        self.frequency = {}
+        self.buckets = {}
+        self.min_freq = 0
+
+    cdef inline void _touch(self, object key):
+        # Move the key from its frequency bucket to the next one
+        cdef Py_ssize_t freq = self.frequency[key]
+        cdef dict bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.frequency[key] = freq + 1
+        bucket = self.buckets.get(freq + 1)
+        if bucket is None:
+            bucket = self.buckets[freq + 1] = {}
+        bucket[key] = None
+
+    def get(self, key):
+        with self.lock:
+            value = self.cache.get(key, _MISS)
+            if value is _MISS:
+                return None
+            self._touch(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self._put_locked(key, value)
+
+    def put_if_absent(self, key, value):
+        with self.lock:
+            if key not in self.cache:
+                self._put_locked(key, value)
+
+    cdef _put_locked(self, key, value):
+        cdef dict bucket
+        if key in self.cache:
+            self.cache[key] = value
+            self._touch(key)
+            return
+        if len(self.cache) >= self.size:
+            # Evict the oldest key of the lowest frequency bucket
+            if self.min_freq not in self.buckets:
+                # The bucket was emptied by pop()
+                self.min_freq = min(self.buckets)
+            bucket = self.buckets[self.min_freq]
+            lfu_key = next(iter(bucket))
+            del bucket[lfu_key]
+            if not bucket:
+                del self.buckets[self.min_freq]
+            del self.cache[lfu_key]
+            del self.frequency[lfu_key]
+        self.cache[key] = value
+        self.frequency[key] = 1
+        bucket = self.buckets.get(1)
+        if bucket is None:
+            bucket = self.buckets[1] = {}
+        bucket[key] = None
+        self.min_freq = 1
+
+    def pop(self, key):
+        cdef dict bucket
+        with self.lock:
+            freq = self.frequency.pop(key, None)
+            if freq is None:
+                return None
+            bucket = self.buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[freq]
+            return self.cache.pop(key)
+
+    def remove(self, key):
+        self.pop(key)
+
+    def items(self):
+        return list(self.cache.items())
+
+    def __str__(self):
+        return str(dict(self.items()))
@@ -1,128 +1,374 @@
-from collections import OrderedDict, Counter
+from functools import partial
+from operator import itemgetter
 from threading import Lock
+import heapq
+import sys
 from typing import Dict, List, Tuple, Union
 
+# Sort key for (key, count) pairs
+_get_count = itemgetter(1)
+# Sentinel for single-probe dictionary lookups where None could be a stored value
+_MISS = object()
+
 # Define a base class for the eviction policies
 class EvictionPolicy:
+    __slots__ = ('size', 'cache', 'lock')
+
     def __init__(self, size: int):
         self.size = size
-        self.cache = OrderedDict()
+        self.cache = {}
         self.lock = Lock()
 
     def get(self, key: str) -> Union[str, None]:
         raise NotImplementedError
 
     def put(self, key: str, value: str) -> None:
+        with self.lock:
+            self._put_locked(key, value)
+
+    def put_if_absent(self, key: str, value: str) -> None:
+        # Insert only a missing key, so a promotion never overwrites a concurrent put
+        with self.lock:
+            if key not in self.cache:
+                self._put_locked(key, value)
+
+    def _put_locked(self, key: str, value: str) -> None:
         raise NotImplementedError
 
+    def pop(self, key: str) -> Union[str, None]:
+        # Remove the key and return its value in a single locked operation
+        with self.lock:
+            return self.cache.pop(key, None)
+
     def remove(self, key: str) -> None:
-        if key in self.cache:
-            del self.cache[key]
+        self.pop(key)
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(self.cache.items())
 
     def __str__(self):
-        return str(self.cache)
+        return str(dict(self.items()))
 
-# LRU Policy
+# LRU Policy (lazy eviction: grows to twice its size, then evicts the oldest half in one pass)
 class LRUPolicy(EvictionPolicy):
+    __slots__ = ('ticks', 'tick')
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        # Tick of each key's last access; lower ticks are less recently used
+        self.ticks: Dict[str, int] = {}
+        self.tick = 0
+
     def get(self, key: str) -> Union[str, None]:
         with self.lock:
-            if key in self.cache:
-                # Move to end to mark it as recently used
-                self.cache.move_to_end(key)
-                return self.cache[key]
-            return None
+            value = self.cache.get(key, _MISS)
+            if value is _MISS:
+                return None
+            # Only the tick is refreshed, neither dict is restructured
+            self.ticks[key] = self.tick
+            self.tick += 1
+            return value
 
-    def put(self, key: str, value: str) -> None:
+    def _put_locked(self, key: str, value: str) -> None:
+        cache, ticks = self.cache, self.ticks
+        if key not in cache and len(cache) >= 2 * self.size:
+            # Evict the least recently used entries in a single sweep
+            for old_key, _ in heapq.nsmallest(self.size, ticks.items(), key=_get_count):
+                del cache[old_key]
+                del ticks[old_key]
+        cache[key] = value
+        ticks[key] = self.tick
+        self.tick += 1
+
+    def pop(self, key: str) -> Union[str, None]:
         with self.lock:
-            if key in self.cache:
-                # Move to end to mark it as recently used
-                self.cache.move_to_end(key)
-            elif len(self.cache) >= self.size:
-                # Remove the first item (least recently used)
-                self.cache.popitem(last=False)
-            self.cache[key] = value
+            self.ticks.pop(key, None)
+            return self.cache.pop(key, None)
 
 # LFU Policy
 class LFUPolicy(EvictionPolicy):
+    __slots__ = ('frequency', 'buckets', 'min_freq')
+
     def __init__(self, size: int):
         super().__init__(size)
-        self.frequency = Counter()
+        self.frequency: Dict[str, int] = {}
+        # Keys grouped by frequency; each bucket is an insertion-ordered dict used as a set,
+        # so ties are evicted oldest first
+        self.buckets: Dict[int, Dict[str, None]] = {}
+        self.min_freq = 0
+
+    def _touch(self, key: str) -> None:
+        # Move the key from its frequency bucket to the next one
+        freq = self.frequency[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.frequency[key] = freq + 1
+        self.buckets.setdefault(freq + 1, {})[key] = None
 
     def get(self, key: str) -> Union[str, None]:
         with self.lock:
-            if key in self.cache:
-                self.frequency[key] += 1
-                return self.cache[key]
+            value = self.cache.get(key, _MISS)
+            if value is _MISS:
+                return None
+            self._touch(key)
+            return value
+
+    def _put_locked(self, key: str, value: str) -> None:
+        if key in self.cache:
+            self.cache[key] = value
+            self._touch(key)
+            return
+        if len(self.cache) >= self.size:
+            # Evict the oldest key of the lowest frequency bucket
+            buckets = self.buckets
+            if self.min_freq not in buckets:
+                # The bucket was emptied by pop()
+                self.min_freq = min(buckets)
+            bucket = buckets[self.min_freq]
+            lfu_key = next(iter(bucket))
+            del bucket[lfu_key]
+            if not bucket:
+                del buckets[self.min_freq]
+            del self.cache[lfu_key]
+            del self.frequency[lfu_key]
+        self.cache[key] = value
+        self.frequency[key] = 1
+        self.buckets.setdefault(1, {})[key] = None
+        self.min_freq = 1
+
+    def pop(self, key: str) -> Union[str, None]:
+        with self.lock:
+            freq = self.frequency.pop(key, None)
+            if freq is None:
+                return None
+            bucket = self.buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[freq]
+            return self.cache.pop(key)
+
+# CLOCK Policy (second-chance approximation of LRU)
+class ClockPolicy(EvictionPolicy):
+    __slots__ = ('slots', 'index', 'ref', 'hand', 'free_slots')
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        # Fixed ring of (key, value) slots with one reference bit per slot
+        self.slots: List[Union[Tuple[str, str], None]] = [None] * size
+        self.index: Dict[str, int] = {}
+        self.ref = bytearray(size)
+        self.hand = 0
+        # Empty slots, filled lowest index first before anything is evicted
+        self.free_slots = list(range(size - 1, -1, -1))
+
+    def get(self, key: str) -> Union[str, None]:
+        # Lock-free: a hit only sets the slot's reference bit
+        idx = self.index.get(key)
+        if idx is None:
+            return None
+        entry = self.slots[idx]
+        if entry is None or entry[0] != key:
+            # The slot was reused by a concurrent put
             return None
+        self.ref[idx] = 1
+        return entry[1]
 
-    def put(self, key: str, value: str) -> None:
+    def put_if_absent(self, key: str, value: str) -> None:
         with self.lock:
-            if key in self.cache:
-                self.cache[key] = value
-                self.frequency[key] += 1
-            elif len(self.cache) >= self.size:
-                # Evict the least frequently used item
-                lfu_key = min(self.frequency, key=lambda k: self.frequency[k])
-                self.cache.pop(lfu_key)
-                del self.frequency[lfu_key]
-            self.cache[key] = value
-            self.frequency[key] = 1
+            if key not in self.index:
+                self._put_locked(key, value)
+
+    def _put_locked(self, key: str, value: str) -> None:
+        idx = self.index.get(key)
+        if idx is not None:
+            self.slots[idx] = (key, value)
+            self.ref[idx] = 1
+            return
+        if self.free_slots:
+            idx = self.free_slots.pop()
+        else:
+            ref, hand = self.ref, self.hand
+            # Advance the hand, clearing reference bits, until an unreferenced slot is found
+            while ref[hand]:
+                ref[hand] = 0
+                hand = (hand + 1) % self.size
+            del self.index[self.slots[hand][0]]
+            idx = hand
+            self.hand = (hand + 1) % self.size
+        self.slots[idx] = (key, value)
+        self.index[key] = idx
+
+    def pop(self, key: str) -> Union[str, None]:
+        with self.lock:
+            idx = self.index.pop(key, None)
+            if idx is None:
+                return None
+            entry = self.slots[idx]
+            self.slots[idx] = None
+            self.ref[idx] = 0
+            self.free_slots.append(idx)
+            return entry[1]
+
+    def items(self) -> List[Tuple[str, str]]:
+        return [entry for entry in self.slots if entry is not None]
+
+# Sharded Policy (splits keys across independently locked sub-caches)
+# Not an EvictionPolicy subclass: the shards hold all entries and locks, so it has no cache or lock of its own
+class ShardedPolicy:
+    __slots__ = ('size', 'mask', 'shards')
+
+    # Small levels are not split further, so sharding does not cost them hit rate
+    min_shard_size = 8
+
+    def __init__(self, size: int, policy: type, shards: int = 16):
+        self.size = size
+        # Keep the shard count a power of two so a key's shard is hash(key) & mask
+        while shards > 1 and size < shards * self.min_shard_size:
+            shards //= 2
+        self.mask = shards - 1
+        # Split the size exactly, giving the remainder to the first shards
+        shard_size, extra = divmod(size, shards)
+        self.shards = [policy(shard_size + (i < extra)) for i in range(shards)]
+
+    def get(self, key: str) -> Union[str, None]:
+        return self.shards[hash(key) & self.mask].get(key)
+
+    def put(self, key: str, value: str) -> None:
+        self.shards[hash(key) & self.mask].put(key, value)
+
+    def put_if_absent(self, key: str, value: str) -> None:
+        self.shards[hash(key) & self.mask].put_if_absent(key, value)
+
+    def pop(self, key: str) -> Union[str, None]:
+        return self.shards[hash(key) & self.mask].pop(key)
+
+    def items(self) -> List[Tuple[str, str]]:
+        return [item for shard in self.shards for item in shard.items()]
+
+    def remove(self, key: str) -> None:
+        self.pop(key)
+
+    def __str__(self):
+        return str(dict(self.items()))
+
+# Prefer the compiled LRU/LFU policies when _cache_ext has been built
+try:
+    from _cache_ext import LRUPolicy, LFUPolicy
+except ImportError:
+    pass
+
+# Eviction policies available to addCacheLevel, by name
+_POLICIES = {
+    'LRU': partial(ShardedPolicy, policy=LRUPolicy),
+    'LFU': partial(ShardedPolicy, policy=LFUPolicy),
+    'CLOCK': ClockPolicy,
+}
 
 # Multilevel Cache System
 class MultilevelCacheSystem:
-    def __init__(self):
-        self.levels: List[EvictionPolicy] = []
+    # Forget the oldest partial hit count once this many keys are tracked
+    hit_counter_limit = 10000
+
+    def __init__(self, promote_after: int = 2, verbose: bool = False):
+        # Levels are an immutable tuple replaced under self.lock, so readers can
+        # snapshot it without locking. The hot paths read the (L1, lower levels)
+        # split instead, which is replaced together with it.
+        self.levels: Tuple[EvictionPolicy, ...] = ()
+        self._split_levels: Union[Tuple[EvictionPolicy, Tuple[EvictionPolicy, ...]], None] = None
         self.lock = Lock()
+        # Lower-level hits are promoted to L1 only on every promote_after-th hit
+        self.promote_after = promote_after
+        # Partial hit counts in insertion order, so the oldest key is dropped first
+        self._hit_counter: Dict[str, int] = {}
+        self.verbose = verbose
 
     def addCacheLevel(self, size: int, evictionPolicy: str) -> None:
+        # A zero-sized level would never evict (LRU) or fail on its first put (LFU, CLOCK)
+        if size < 1:
+            raise ValueError(f"Cache level size must be at least 1, got {size}")
         with self.lock:
-            if evictionPolicy == 'LRU':
-                policy = LRUPolicy(size)
-            elif evictionPolicy == 'LFU':
-                policy = LFUPolicy(size)
-            else:
+            policy = _POLICIES.get(evictionPolicy)
+            if policy is None:
                 raise ValueError(f"Unsupported eviction policy: {evictionPolicy}")
-            self.levels.append(policy)
+            self._set_levels(self.levels + (policy(size),))
+        if self.verbose:
             print(f"Added Cache Level with size {size} and eviction policy {evictionPolicy}")
 
     def removeCacheLevel(self, level: int) -> None:
         with self.lock:
             if 0 <= level < len(self.levels):
-                self.levels.pop(level)
-                print(f"Removed Cache Level {level + 1}")
+                self._set_levels(self.levels[:level] + self.levels[level + 1:])
             else:
                 raise IndexError("Cache level out of range")
+        if self.verbose:
+            print(f"Removed Cache Level {level + 1}")
+
+    def _set_levels(self, levels: Tuple[EvictionPolicy, ...]) -> None:
+        self.levels = levels
+        self._split_levels = (levels[0], levels[1:]) if levels else None
 
     def get(self, key: str) -> Union[str, None]:
-        with self.lock:
-            for level in self.levels:
-                value = level.get(key)
-                if value is not None:
-                    # Move data up to higher levels
-                    self._move_up(key, value)
-                    return value
+        split_levels = self._split_levels
+        if split_levels is None:
             return None
+        top, lower = split_levels
+        value = top.get(key)
+        if value is None:
+            # Move data up from lower levels
+            value = self._move_up(top, lower, key)
+        return value
 
     def put(self, key: str, value: str) -> None:
-        with self.lock:
-            # Insert data into L1 cache
-            self.levels[0].put(key, value)
-            self._move_up(key, value)
+        key = sys.intern(key) if type(key) is str else key
+        split_levels = self._split_levels
+        if split_levels is None:
+            raise IndexError("No cache levels")
+        top, lower = split_levels
+        # Insert data into L1 cache
+        top.put(key, value)
+        # Drop stale copies held by lower levels
+        for level in lower:
+            level.pop(key)
+        self._hit_counter.pop(key, None)
+        if self.verbose:
             print(f"Inserted {key} into L1 cache")
 
-    def _move_up(self, key: str, value: str) -> None:
-        for i in range(1, len(self.levels)):
-            if self.levels[i].get(key) is not None:
-                self.levels[i].remove(key)
-                self.levels[i].put(key, value)
+    def _move_up(self, top: EvictionPolicy, lower: Tuple[EvictionPolicy, ...], key: str) -> Union[str, None]:
+        # Read the key from the first lower level holding it; once it is due for
+        # promotion, pop it from that level and move it to L1 instead
+        hit_counter = self._hit_counter
+        # The counts are updated without a lock; a racing hit may lose an increment,
+        # which only delays that key's promotion
+        promote = hit_counter.get(key, 0) + 1 >= self.promote_after
+        for level in lower:
+            value = level.pop(key) if promote else level.get(key)
+            if value is not None:
+                if promote:
+                    hit_counter.pop(key, None)
+                    # A put that ran since the pop above holds a newer value; keep it
+                    top.put_if_absent(key, value)
+                else:
+                    count = hit_counter.get(key, 0)
+                    if not count and len(hit_counter) >= self.hit_counter_limit:
+                        try:
+                            del hit_counter[next(iter(hit_counter))]
+                        except (StopIteration, KeyError, RuntimeError):
+                            # Another thread changed the counts in the meantime
+                            pass
+                    hit_counter[key] = count + 1
+                return value
+        return None
 
     def displayCache(self) -> None:
-        with self.lock:
-            for i, level in enumerate(self.levels):
-                print(f"L{i + 1} Cache: {level}")
+        for i, level in enumerate(self.levels):
+            print(f"L{i + 1} Cache: {level}")
 
 def main():
-    cache_system = MultilevelCacheSystem()
+    cache_system = MultilevelCacheSystem(verbose=True)
     
     while True:
         print("\nOptions:")
@@ -137,7 +383,7 @@ def main():
 
         if choice == '1':
             size = int(input("Enter cache size: "))
-            evictionPolicy = input("Enter eviction policy (LRU/LFU): ")
+            evictionPolicy = input("Enter eviction policy (LRU/LFU/CLOCK): ")
             cache_system.addCacheLevel(size, evictionPolicy)
         elif choice == '2':
             level = int(input("Enter cache level to remove (1 for L1, 2 for L2, etc.): ")) - 1
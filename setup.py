@@ -0,0 +1,10 @@
+# Builds the optional compiled eviction policies used by code.py:
+#     python setup.py build_ext --inplace
+# Without the extension, code.py falls back to its pure-Python policies.
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="multilevel-cache-ext",
+    ext_modules=cythonize("_cache_ext.pyx", language_level=3),
+)